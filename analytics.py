@@ -2,64 +2,164 @@
 
 import json
 import sqlite3
-from collections import Counter
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 LEVEL_ORDER = ["IC", "Senior", "Staff", "Manager", "Director", "VP", "C-Suite"]
 
 
-def _load_jobs(db_path: str) -> pd.DataFrame:
-    """Load jobs table into a pandas DataFrame, sorted by person_id and started_at."""
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql_query(
-        "SELECT person_id, title, level, company_name, company_industry, started_at, ended_at FROM jobs ORDER BY person_id, started_at",
-        conn,
+# Page cache per connection, in KiB: the default is sized for the connection that loads the jobs
+# frame; compute_all's worker threads each run one aggregate query and get the smaller budget.
+_CACHE_KIB = 131072
+_WORKER_CACHE_KIB = 16384
+
+
+def open_db(db_path: str, cache_kib: int = _CACHE_KIB) -> sqlite3.Connection:
+    """Open the analytics DB read-only with a `cache_kib` page cache and memory-mapped reads."""
+    uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, isolation_level=None)
+    conn.executescript(
+        f"PRAGMA query_only=1; PRAGMA mmap_size=1073741824; PRAGMA cache_size=-{int(cache_kib)}; PRAGMA temp_store=MEMORY;"
     )
-    conn.close()
+    return conn
+
+
+@contextmanager
+def _connection(db_path: str, conn: sqlite3.Connection | None = None):
+    """Yield conn if one is passed in, otherwise a fresh connection that is closed on exit."""
+    if conn is not None:
+        yield conn
+        return
+    conn = open_db(db_path)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _read_frame(conn: sqlite3.Connection, sql: str, params=()) -> pd.DataFrame:
+    """Run a query and build the DataFrame column by column straight from the cursor rows."""
+    cur = conn.execute(sql, params)
+    columns = [d[0] for d in cur.description]
+    rows = cur.fetchall()
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame(dict(zip(columns, zip(*rows))))
+
+
+def _load_jobs(conn: sqlite3.Connection) -> pd.DataFrame:
+    """Load the jobs columns the frame metrics read (person_id, title, started_at), sorted by person_id and started_at.
+
+    started_at is parsed once to datetime64 (NaT if missing/unparseable) and title is
+    categorical with interned labels, so consumers never re-parse or re-hash strings and
+    every result dict shares one object per title.
+    """
+    df = _read_frame(conn, "SELECT person_id, title, started_at FROM jobs ORDER BY person_id, started_at")
+    started = pd.to_datetime(df["started_at"], errors="coerce", format="ISO8601", utc=True)
+    # Keep the unit to_datetime picks: forcing ns would overflow on sentinel dates like 9999-12-31
+    df["started_at"] = started.dt.tz_localize(None)
+    df["title"] = df["title"].astype("category").cat.rename_categories(sys.intern)
     return df
 
 
-def promotion_velocity(db_path: str) -> dict:
+# Adjacent-job pairs are built in SQLite with window functions (LEAD), so only the
+# already-paired rows cross into Python. Jobs with no start date sort last, ties by insertion.
+# On large DBs, CREATE INDEX IF NOT EXISTS idx_jobs_person_started ON jobs(person_id, started_at)
+# lets SQLite walk these windows (and _load_jobs' ORDER BY) in index order instead of sorting.
+_JOB_ORDER = "started_at IS NULL, started_at, id"
+
+# julianday() returns NULL for month-only "YYYY-MM" and reads a bare "YYYY" as a Julian day
+# number, so partial dates are padded to the first of the month/year first. This matches
+# _load_jobs, whose ISO8601 parse accepts the same partial dates.
+_START_DAY = (
+    "CASE WHEN length(started_at) < 10"
+    " THEN julianday(substr(started_at || '-01-01', 1, 10))"
+    " ELSE julianday(started_at) END"
+)
+
+_LEVEL_PAIRS_SQL = f"""
+WITH dated AS (
+    SELECT id, person_id, level, {_START_DAY} AS start_day
+    FROM jobs
+    WHERE level IN ({",".join("?" * len(LEVEL_ORDER))})
+),
+pairs AS (
+    SELECT
+        level AS from_level,
+        LEAD(level) OVER w AS to_level,
+        CAST(LEAD(start_day) OVER w - start_day AS INTEGER) AS gap_days
+    FROM dated
+    WHERE start_day IS NOT NULL
+    WINDOW w AS (PARTITION BY person_id ORDER BY start_day, id)
+)
+SELECT from_level, to_level, gap_days
+FROM pairs
+WHERE to_level IS NOT NULL AND from_level <> to_level
+"""
+
+_TRANSITIONS_SQL = """
+WITH pairs AS (
+    SELECT
+        {col} AS src,
+        LEAD({col}) OVER (PARTITION BY person_id ORDER BY {order}) AS dst,
+        ROW_NUMBER() OVER (ORDER BY person_id, {order}) AS seq
+    FROM jobs
+    WHERE {col} IS NOT NULL
+)
+SELECT src, dst, COUNT(*) * 1.0 / SUM(COUNT(*)) OVER (PARTITION BY src) AS probability
+FROM pairs
+WHERE dst IS NOT NULL {extra}
+GROUP BY src, dst
+ORDER BY src, COUNT(*) DESC, MIN(seq)
+"""
+
+
+def _transition_probabilities(conn: sqlite3.Connection, col: str, changed_only: bool = False) -> dict:
+    """Pair each job's `col` with the next job's value for the same person and normalize counts.
+
+    Returns dict keyed by from-value, values are dicts of to-value -> probability (most likely first).
+    """
+    sql = _TRANSITIONS_SQL.format(
+        col=col,
+        order=_JOB_ORDER,
+        extra="AND src <> dst" if changed_only else "",
+    )
+    rows = conn.execute(sql).fetchall()
+
+    result: dict[str, dict[str, float]] = {}
+    for src, dst, probability in rows:
+        result.setdefault(sys.intern(src), {})[sys.intern(dst)] = round(probability, 4)
+    return result
+
+
+def promotion_velocity(db_path: str, conn: sqlite3.Connection | None = None) -> dict:
     """Compute median months between level transitions, grouped by (from_level, to_level).
 
     Returns dict keyed by "from_level -> to_level" with median_months, sample_size, low_confidence.
     """
-    df = _load_jobs(db_path)
-
-    # Only keep jobs with known levels in LEVEL_ORDER
-    df = df[df["level"].isin(LEVEL_ORDER)].copy()
-    df["started_at"] = pd.to_datetime(df["started_at"], errors="coerce")
-    df = df.dropna(subset=["started_at"])
-    df = df.sort_values(["person_id", "started_at"])
+    # Only jobs with known levels in LEVEL_ORDER and a parseable start date are paired
+    with _connection(db_path, conn) as conn:
+        tdf = _read_frame(conn, _LEVEL_PAIRS_SQL, LEVEL_ORDER)
 
-    # For each person, find consecutive jobs where level changes
-    transitions = []
-    for person_id, group in df.groupby("person_id"):
-        rows = group.reset_index(drop=True)
-        for i in range(len(rows) - 1):
-            from_level = rows.loc[i, "level"]
-            to_level = rows.loc[i + 1, "level"]
-            if from_level != to_level:
-                gap = (rows.loc[i + 1, "started_at"] - rows.loc[i, "started_at"])
-                gap_months = gap.days / 30.44  # approximate months
-                transitions.append({
-                    "from_level": from_level,
-                    "to_level": to_level,
-                    "gap_months": gap_months,
-                })
-
-    if not transitions:
+    if tdf.empty:
         return {}
 
-    tdf = pd.DataFrame(transitions)
+    tdf["gap_months"] = tdf["gap_days"] / 30.44  # approximate months
+    grouped = tdf.groupby(["from_level", "to_level"])["gap_months"]
+    medians = grouped.median()
+    sizes = grouped.size()
+
     result = {}
-    for (fl, tl), grp in tdf.groupby(["from_level", "to_level"]):
+    for (fl, tl), median in medians.items():
         key = f"{fl} -> {tl}"
-        median = round(grp["gap_months"].median(), 1)
-        size = len(grp)
+        size = int(sizes[(fl, tl)])
         result[key] = {
-            "median_months": median,
+            "median_months": round(float(median), 1),
             "sample_size": size,
             "low_confidence": size < 10,
         }
@@ -67,155 +167,127 @@ def promotion_velocity(db_path: str) -> dict:
     return result
 
 
-def role_transitions(db_path: str) -> dict:
+def role_transitions(db_path: str, conn: sqlite3.Connection | None = None) -> dict:
     """Compute transition probabilities between job titles.
 
     Returns dict keyed by from_title, values are dicts of to_title -> probability.
     """
-    df = _load_jobs(db_path)
-    df = df.dropna(subset=["title"])
-    df = df.sort_values(["person_id", "started_at"])
-
-    transitions = []
-    for person_id, group in df.groupby("person_id"):
-        rows = group.reset_index(drop=True)
-        for i in range(len(rows) - 1):
-            transitions.append({
-                "from_title": rows.loc[i, "title"],
-                "to_title": rows.loc[i + 1, "title"],
-            })
-
-    if not transitions:
-        return {}
+    with _connection(db_path, conn) as conn:
+        return _transition_probabilities(conn, "title")
 
-    tdf = pd.DataFrame(transitions)
-    result = {}
-    for from_title, grp in tdf.groupby("from_title"):
-        counts = grp["to_title"].value_counts()
-        total = counts.sum()
-        result[from_title] = {title: round(count / total, 4) for title, count in counts.items()}
-
-    return result
 
-
-def major_to_first_role(db_path: str) -> dict:
+def major_to_first_role(db_path: str, conn: sqlite3.Connection | None = None, jobs: pd.DataFrame | None = None) -> dict:
     """Map education field to first job title.
 
+    Pass a frame from _load_jobs as `jobs` to skip re-reading the jobs table.
     Returns dict keyed by field, values are dicts of title -> proportion (top 10).
     """
-    conn = sqlite3.connect(db_path)
-
-    # Get each person's earliest job
-    first_jobs = pd.read_sql_query(
-        """
-        SELECT j.person_id, j.title
-        FROM jobs j
-        INNER JOIN (
-            SELECT person_id, MIN(started_at) AS min_start
-            FROM jobs
-            WHERE started_at IS NOT NULL AND title IS NOT NULL
-            GROUP BY person_id
-        ) earliest ON j.person_id = earliest.person_id AND j.started_at = earliest.min_start
-        WHERE j.title IS NOT NULL
-        """,
-        conn,
-    )
+    with _connection(db_path, conn) as conn:
+        if jobs is None:
+            jobs = _load_jobs(conn)
+        # Get education fields
+        edu = _read_frame(conn, "SELECT person_id, field FROM education WHERE field IS NOT NULL")
 
-    # Get education fields
-    edu = pd.read_sql_query(
-        "SELECT person_id, field FROM education WHERE field IS NOT NULL",
-        conn,
-    )
-    conn.close()
+    # Get each person's earliest job (every job tied for the earliest start counts)
+    dated = jobs.dropna(subset=["started_at", "title"])
+    earliest = dated.groupby("person_id", sort=False)["started_at"].transform("min")
+    first_jobs = dated.loc[dated["started_at"] == earliest, ["person_id", "title"]]
 
     if first_jobs.empty or edu.empty:
         return {}
 
     merged = edu.merge(first_jobs, on="person_id")
 
+    # Top 10 titles per field in one grouped pass; stable sort keeps first-seen order on ties
+    counts = merged.groupby(["field", "title"], sort=False, observed=True).size()
+    top10 = counts.sort_values(ascending=False, kind="stable").groupby(level=0).head(10)
+
     result = {}
-    for field, grp in merged.groupby("field"):
-        counts = grp["title"].value_counts().head(10)
-        total = counts.sum()
-        result[field] = {title: round(count / total, 4) for title, count in counts.items()}
+    for field, grp in top10.groupby(level=0):
+        total = int(grp.sum())
+        result[sys.intern(field)] = {title: round(int(count) / total, 4) for title, count in grp.droplevel(0).items()}
 
     return result
 
 
-def industry_transitions(db_path: str) -> dict:
+def industry_transitions(db_path: str, conn: sqlite3.Connection | None = None) -> dict:
     """Compute transition probabilities between industries (only where industry changed).
 
     Returns dict keyed by from_industry, values are dicts of to_industry -> probability.
     """
-    df = _load_jobs(db_path)
-    df = df.dropna(subset=["company_industry"])
-    df = df.sort_values(["person_id", "started_at"])
-
-    transitions = []
-    for person_id, group in df.groupby("person_id"):
-        rows = group.reset_index(drop=True)
-        for i in range(len(rows) - 1):
-            from_ind = rows.loc[i, "company_industry"]
-            to_ind = rows.loc[i + 1, "company_industry"]
-            if from_ind != to_ind:
-                transitions.append({
-                    "from_industry": from_ind,
-                    "to_industry": to_ind,
-                })
-
-    if not transitions:
-        return {}
-
-    tdf = pd.DataFrame(transitions)
-    result = {}
-    for from_ind, grp in tdf.groupby("from_industry"):
-        counts = grp["to_industry"].value_counts()
-        total = counts.sum()
-        result[from_ind] = {ind: round(count / total, 4) for ind, count in counts.items()}
-
-    return result
+    with _connection(db_path, conn) as conn:
+        return _transition_probabilities(conn, "company_industry", changed_only=True)
 
 
-def paths_to_role(db_path: str) -> dict:
+def paths_to_role(db_path: str, conn: sqlite3.Connection | None = None, jobs: pd.DataFrame | None = None) -> dict:
     """For each final job title, find the most common career paths leading to it.
 
+    Pass a frame from _load_jobs as `jobs` to skip re-reading the jobs table.
     Returns dict keyed by final title, values are lists of {"path": [...], "frequency": int}.
     """
-    df = _load_jobs(db_path)
-    df = df.dropna(subset=["title"])
+    if jobs is None:
+        with _connection(db_path, conn) as conn:
+            jobs = _load_jobs(conn)
+    df = jobs.dropna(subset=["title"])
     df = df.sort_values(["person_id", "started_at"])
 
-    paths_by_final: dict[str, Counter] = {}
-    for person_id, group in df.groupby("person_id"):
-        titles = group["title"].tolist()
-        if not titles:
-            continue
-        final = titles[-1]
-        path_key = tuple(titles)
-        if final not in paths_by_final:
-            paths_by_final[final] = Counter()
-        paths_by_final[final][path_key] += 1
+    if df.empty:
+        return {}
+
+    # Rows are contiguous per person after the sort, so one split yields every title sequence.
+    # Paths are keyed on the small-int category codes and only the top 5 are decoded to titles.
+    labels = list(df["title"].cat.categories)
+    person_codes, _ = pd.factorize(df["person_id"])
+    boundaries = np.flatnonzero(np.diff(person_codes)) + 1
+    paths = [tuple(group.tolist()) for group in np.split(df["title"].cat.codes.to_numpy(), boundaries)]
+    people = pd.DataFrame({"final": [path[-1] for path in paths], "path": paths})
+    counts = people.groupby(["final", "path"], sort=False).size()
 
     result = {}
-    for final_title, counter in paths_by_final.items():
-        top5 = counter.most_common(5)
-        result[final_title] = [
-            {"path": list(path), "frequency": freq}
-            for path, freq in top5
+    for final_code, grp in counts.groupby(level=0, sort=False):
+        top5 = grp.droplevel(0).nlargest(5)
+        result[labels[final_code]] = [
+            {"path": [labels[code] for code in path], "frequency": int(freq)}
+            for path, freq in top5.items()
         ]
 
     return result
 
 
-def compute_all(db_path: str) -> dict:
-    """Compute all 5 career trajectory metrics."""
-    return {
-        "promotion_velocity": promotion_velocity(db_path),
-        "role_transitions": role_transitions(db_path),
-        "major_to_first_role": major_to_first_role(db_path),
-        "industry_transitions": industry_transitions(db_path),
-        "paths_to_role": paths_to_role(db_path),
-    }
+def _run_on_worker_conn(metric, db_path: str) -> dict:
+    """Run one SQL-bound metric over its own small-cache connection (for compute_all's threads)."""
+    conn = open_db(db_path, cache_kib=_WORKER_CACHE_KIB)
+    try:
+        return metric(db_path, conn)
+    finally:
+        conn.close()
+
+
+def compute_all(db_path: str, conn: sqlite3.Connection | None = None) -> dict:
+    """Compute all 5 career trajectory metrics.
+
+    The three transition metrics (promotion_velocity, role_transitions, industry_transitions)
+    are SQLite-bound (sqlite3 releases the GIL while a query runs), so they run on worker
+    threads, each over its own small-cache connection. Only major_to_first_role and
+    paths_to_role use `conn` (if given); they run here over the one jobs frame.
+    """
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        promo = pool.submit(_run_on_worker_conn, promotion_velocity, db_path)
+        roles = pool.submit(_run_on_worker_conn, role_transitions, db_path)
+        industries = pool.submit(_run_on_worker_conn, industry_transitions, db_path)
+
+        with _connection(db_path, conn) as conn:
+            jobs = _load_jobs(conn)
+            majors = major_to_first_role(db_path, conn, jobs=jobs)
+            paths = paths_to_role(db_path, conn, jobs=jobs)
+
+        return {
+            "promotion_velocity": promo.result(),
+            "role_transitions": roles.result(),
+            "major_to_first_role": majors,
+            "industry_transitions": industries.result(),
+            "paths_to_role": paths,
+        }
 
 
 if __name__ == "__main__":
@@ -229,4 +301,9 @@ if __name__ == "__main__":
 
     db_path = os.environ.get("DB_PATH", "skillshock.db")
     result = compute_all(db_path)
-    print(json.dumps(result, indent=2, default=str))
+    try:
+        import orjson
+        options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        sys.stdout.buffer.write(orjson.dumps(result, default=str, option=options) + b"\n")
+    except ImportError:
+        print(json.dumps(result, indent=2, default=str))
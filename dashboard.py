@@ -4,17 +4,26 @@ Gradio + Plotly interactive visualizations over output.json
 Launch: python dashboard.py
 """
 
+import heapq
 import json
 import re
+from functools import lru_cache
+
 import gradio as gr
-import plotly.express as px
 import plotly.graph_objects as go
 
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib parser
+    orjson = None
+
 # ---------------------------------------------------------------------------
 # Load data once at startup
 # ---------------------------------------------------------------------------
-with open("output.json") as f:
-    data = json.load(f)
+with open("output.json", "rb") as f:
+    raw = f.read()
+data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+del raw
 
 metadata = data["metadata"]
 promo = data["promotion_velocity"]
@@ -23,52 +32,100 @@ major_first = data["major_to_first_role"]
 industry_trans = data["industry_transitions"]
 paths_to_role = data["paths_to_role"]
 
+
+def _top_items(probs, n=10):
+    """Highest-probability (key, probability) pairs, ties kept in input order."""
+    return heapq.nlargest(n, probs.items(), key=lambda x: x[1])
+
+
+# Ranked slices the builders display, sorted once here rather than on every callback
+TOP10_ROLE_TRANS = {r: _top_items(targets) for r, targets in role_trans.items()}
+TOP10_MAJOR_FIRST = {m: _top_items(roles) for m, roles in major_first.items()}
+TOP10_INDUSTRY_TRANS = {i: _top_items(dests) for i, dests in industry_trans.items()}
+TOP5_PATHS = {
+    r: heapq.nlargest(5, paths, key=lambda p: p["frequency"])
+    for r, paths in paths_to_role.items()
+}
+
 # ---------------------------------------------------------------------------
 # Pre-compute dropdown options (top-N most common entries)
 # ---------------------------------------------------------------------------
 
 # Top 50 source roles
 _role_counts = {r: len(targets) for r, targets in role_trans.items()}
-top_roles = sorted(_role_counts, key=_role_counts.get, reverse=True)[:50]
+top_roles = heapq.nlargest(50, _role_counts, key=_role_counts.get)
 
 # Majors: filter to real-looking names (>= 4 chars, not numeric, >= 3 roles)
+_NUM_PUNCT_RE = re.compile(r"^[\d.\-\s/,]+$")
+_STARTS_DIGIT_RE = re.compile(r"^\d")
 _real_majors = {
     m: roles for m, roles in major_first.items()
     if len(m) >= 4
-    and not re.match(r"^[\d.\-\s/,]+$", m)
+    and not _NUM_PUNCT_RE.match(m)
     and not m.startswith('"')
     and len(roles) >= 3
-    and not re.match(r"^\d", m)
+    and not _STARTS_DIGIT_RE.match(m)
 }
 # All real majors for dropdown (sorted by role count); allow_custom_value lets user type any major
 top_majors = sorted(_real_majors, key=lambda m: (-len(_real_majors[m]), m))
 
 
+def _lowered(choices: list) -> list:
+    """(choice, lowercased choice) pairs, so searches never re-lowercase the options."""
+    return [(x, x.lower()) for x in choices]
+
+
 def _choices_prefix_first(choices: list, query: str) -> list:
-    """Filter choices by query; put prefix matches first, then other substring matches (order within each group unchanged)."""
+    """Filter (choice, lowercase) pairs by query in one pass; prefix matches first, then other substring matches (order within each group unchanged)."""
     if not query or not query.strip():
-        return choices
+        return [x for x, _ in choices]
     q = query.strip().lower()
-    prefix = [x for x in choices if x.lower().startswith(q)]
-    rest = [x for x in choices if x not in prefix and q in x.lower()]
+    prefix, rest = [], []
+    for x, lower in choices:
+        if lower.startswith(q):
+            prefix.append(x)
+        elif q in lower:
+            rest.append(x)
     return prefix + rest
 
 
 def _major_choices_for_search(query: str) -> list:
     """Filter majors by query; prefix matches first."""
-    return _choices_prefix_first(top_majors, query)
+    return _choices_prefix_first(_top_majors_lc, query)
+
+
+# Case-insensitive lookup for typed majors: normalized name -> original key
+_major_lookup = {m.strip().lower(): m for m in major_first}
 
 
-# Case-insensitive lookup: normalized name -> (original_key, roles) for typed majors
-_major_lookup = {m.strip().lower(): (m, roles) for m, roles in major_first.items()}
+def _resolve_major(query: str):
+    """Map a typed major to its data key: exact, then case-insensitive match."""
+    if query in TOP10_MAJOR_FIRST:
+        return query
+    return _major_lookup.get((query or "").strip().lower())
 
 # Top 30 industries
 _ind_counts = {ind: len(dests) for ind, dests in industry_trans.items()}
-top_industries = sorted(_ind_counts, key=_ind_counts.get, reverse=True)[:30]
+top_industries = heapq.nlargest(30, _ind_counts, key=_ind_counts.get)
 
 # Top 50 target roles (career paths)
 _path_counts = {r: sum(p["frequency"] for p in paths) for r, paths in paths_to_role.items()}
-top_target_roles = sorted(_path_counts, key=_path_counts.get, reverse=True)[:50]
+top_target_roles = heapq.nlargest(50, _path_counts, key=_path_counts.get)
+
+_top_roles_lc = _lowered(top_roles)
+_top_majors_lc = _lowered(top_majors)
+_top_industries_lc = _lowered(top_industries)
+_top_target_roles_lc = _lowered(top_target_roles)
+
+# From here on only the ranked slices, the counts and the key sets above are read, so the
+# full distributions are released instead of staying alive for the life of the server.
+dimension_counts = {
+    "roles": len(role_trans),
+    "majors": len(major_first),
+    "industries": len(industry_trans),
+    "target_roles": len(paths_to_role),
+}
+del data, role_trans, major_first, industry_trans, paths_to_role, _real_majors
 
 # ---------------------------------------------------------------------------
 # Chart builders
@@ -79,132 +136,150 @@ PAPER_BG = "#1e1e2e"
 FONT_COLOR = "#cdd6f4"
 GRID_COLOR = "#45475a"
 
+CONFIDENCE_COLORS = {"High Confidence": "#89b4fa", "Low Confidence": "#f38ba8"}
+
+# Charts are assembled as plain trace/layout dicts and wrapped with validation
+# disabled, so plotly never runs its per-property validators on the hot path.
+BASE_LAYOUT = {
+    "plot_bgcolor": PLOT_BG,
+    "paper_bgcolor": PAPER_BG,
+    "font": {"color": FONT_COLOR},
+    "margin": {"l": 20, "r": 20, "t": 40, "b": 20},
+    "xaxis": {"gridcolor": GRID_COLOR, "zeroline": False},
+    "yaxis": {"gridcolor": GRID_COLOR, "zeroline": False},
+}
 
-def _style(fig):
-    """Apply consistent dark styling to a plotly figure."""
-    fig.update_layout(
-        plot_bgcolor=PLOT_BG,
-        paper_bgcolor=PAPER_BG,
-        font_color=FONT_COLOR,
-        margin=dict(l=20, r=20, t=40, b=20),
-    )
-    fig.update_xaxes(gridcolor=GRID_COLOR, zeroline=False)
-    fig.update_yaxes(gridcolor=GRID_COLOR, zeroline=False)
-    return fig
+
+def _payload(data, layout):
+    """Figure dict with the dark theme applied under layout (axis settings are merged)."""
+    merged = {**BASE_LAYOUT, **layout}
+    for axis in ("xaxis", "yaxis"):
+        merged[axis] = {**BASE_LAYOUT[axis], **layout.get(axis, {})}
+    return {"data": data, "layout": merged}
+
+
+def _figure(payload):
+    """Wrap a figure dict in a fresh Figure so cached payloads are never shared or mutated."""
+    return go.Figure(payload, _validate=False)
+
+
+@lru_cache(maxsize=None)
+def _empty_payload(message):
+    """Blank themed figure carrying a centered message."""
+    return _payload([], {"annotations": [{"text": message, "showarrow": False, "font": {"size": 18}}]})
+
+
+def _probability_payload(items, title, color):
+    """Horizontal bar chart of (label, probability) pairs, highest probability on top."""
+    labels = [item[0] for item in items][::-1]
+    probs = [item[1] for item in items][::-1]
+    trace = {
+        "type": "bar",
+        "x": probs,
+        "y": labels,
+        "orientation": "h",
+        "text": [f"{p:.1%}" for p in probs],
+        "textposition": "outside",
+        "marker": {"color": color},
+    }
+    return _payload([trace], {
+        "title": {"text": title},
+        "height": 450,
+        "xaxis": {"title": {"text": "Probability"}, "tickformat": ".0%"},
+        "yaxis": {"title": {"text": ""}},
+    })
+
+
+def _promo_payload():
+    """Figure dict for the promotion-velocity chart, one bar trace per confidence bucket."""
+    traces = {}
+    for trans, info in promo.items():
+        confidence = "Low Confidence" if info["low_confidence"] else "High Confidence"
+        trace = traces.get(confidence)
+        if trace is None:
+            trace = traces[confidence] = {
+                "type": "bar",
+                "name": confidence,
+                "legendgroup": confidence,
+                "orientation": "h",
+                "x": [],
+                "y": [],
+                "text": [],
+                "textposition": "outside",
+                "marker": {"color": CONFIDENCE_COLORS[confidence]},
+            }
+        trace["x"].append(info["median_months"])
+        trace["y"].append(trans)
+        trace["text"].append(f"{info['median_months']:.0f}mo (n={info['sample_size']:,})")
+
+    return _payload(list(traces.values()), {
+        "title": {"text": "Median Months per Level Transition"},
+        "height": 500,
+        "barmode": "relative",
+        "legend": {"title": {"text": "Confidence"}},
+        "xaxis": {"title": {"text": "Median Months"}},
+        "yaxis": {"title": {"text": ""}, "autorange": "reversed"},
+    })
+
+
+# promo never changes after load, so the chart is assembled exactly once
+PROMO_PAYLOAD = _promo_payload()
 
 
 def build_promo_chart():
     """Bar chart of median months per level transition, colored by confidence."""
-    labels, months, colors, samples = [], [], [], []
-    for trans, info in promo.items():
-        labels.append(trans)
-        months.append(info["median_months"])
-        colors.append("Low Confidence" if info["low_confidence"] else "High Confidence")
-        samples.append(info["sample_size"])
-
-    fig = px.bar(
-        x=months, y=labels, orientation="h",
-        color=colors,
-        color_discrete_map={"High Confidence": "#89b4fa", "Low Confidence": "#f38ba8"},
-        labels={"x": "Median Months", "y": "", "color": "Confidence"},
-        title="Median Months per Level Transition",
-        text=[f"{m:.0f}mo (n={s:,})" for m, s in zip(months, samples)],
+    return _figure(PROMO_PAYLOAD)
+
+
+# The dropdown-driven builders are pure functions of one string over data that never
+# changes after startup, so their figure dicts are memoized per selection.
+
+@lru_cache(maxsize=512)
+def _role_transition_payload(source_role):
+    sorted_targets = TOP10_ROLE_TRANS.get(source_role)
+    if not sorted_targets:
+        return _empty_payload("No data for this role")
+
+    return _probability_payload(sorted_targets, f"Top 10 Next Roles from: {source_role}", "#a6e3a1")
+
+
+@lru_cache(maxsize=512)
+def _major_payload(major):
+    major = _resolve_major(major) or major
+    sorted_roles = TOP10_MAJOR_FIRST.get(major)
+    if not sorted_roles:
+        return _empty_payload("No data for this major")
+
+    return _probability_payload(sorted_roles, f"Top 10 First Roles for: {major}", "#f9e2af")
+
+
+@lru_cache(maxsize=512)
+def _industry_payload(source_industry):
+    sorted_dests = TOP10_INDUSTRY_TRANS.get(source_industry)
+    if not sorted_dests:
+        return _empty_payload("No data for this industry")
+
+    return _probability_payload(
+        sorted_dests, f"Top 10 Industries People Switch To from: {source_industry}", "#cba6f7"
     )
-    fig.update_traces(textposition="outside")
-    fig.update_layout(yaxis=dict(autorange="reversed"), height=500)
-    return _style(fig)
 
 
 def build_role_transition_chart(source_role):
     """Top 10 next roles for a given source role."""
-    targets = role_trans.get(source_role, {})
-    if not targets:
-        fig = go.Figure()
-        fig.add_annotation(text="No data for this role", showarrow=False, font_size=18)
-        return _style(fig)
-
-    sorted_targets = sorted(targets.items(), key=lambda x: x[1], reverse=True)[:10]
-    roles = [t[0] for t in sorted_targets][::-1]
-    probs = [t[1] for t in sorted_targets][::-1]
-
-    fig = px.bar(
-        x=probs, y=roles, orientation="h",
-        labels={"x": "Probability", "y": ""},
-        title=f"Top 10 Next Roles from: {source_role}",
-        text=[f"{p:.1%}" for p in probs],
-        color_discrete_sequence=["#a6e3a1"],
-    )
-    fig.update_traces(textposition="outside")
-    fig.update_layout(height=450, xaxis_tickformat=".0%")
-    return _style(fig)
+    return _figure(_role_transition_payload(source_role))
 
 
 def build_major_chart(major):
     """Top 10 first job titles for a given major."""
-    roles = major_first.get(major, {})
-    if not roles:
-        fig = go.Figure()
-        fig.add_annotation(text="No data for this major", showarrow=False, font_size=18)
-        return _style(fig)
-
-    sorted_roles = sorted(roles.items(), key=lambda x: x[1], reverse=True)[:10]
-    titles = [r[0] for r in sorted_roles][::-1]
-    probs = [r[1] for r in sorted_roles][::-1]
-
-    fig = px.bar(
-        x=probs, y=titles, orientation="h",
-        labels={"x": "Probability", "y": ""},
-        title=f"Top 10 First Roles for: {major}",
-        text=[f"{p:.1%}" for p in probs],
-        color_discrete_sequence=["#f9e2af"],
-    )
-    fig.update_traces(textposition="outside")
-    fig.update_layout(height=450, xaxis_tickformat=".0%")
-    return _style(fig)
+    return _figure(_major_payload(major))
 
 
 def build_industry_chart(source_industry):
     """Top 10 destination industries from a given source industry."""
-    dests = industry_trans.get(source_industry, {})
-    if not dests:
-        fig = go.Figure()
-        fig.add_annotation(text="No data for this industry", showarrow=False, font_size=18)
-        return _style(fig)
-
-    sorted_dests = sorted(dests.items(), key=lambda x: x[1], reverse=True)[:10]
-    industries = [d[0] for d in sorted_dests][::-1]
-    probs = [d[1] for d in sorted_dests][::-1]
-
-    fig = px.bar(
-        x=probs, y=industries, orientation="h",
-        labels={"x": "Probability", "y": ""},
-        title=f"Top 10 Industries People Switch To from: {source_industry}",
-        text=[f"{p:.1%}" for p in probs],
-        color_discrete_sequence=["#cba6f7"],
-    )
-    fig.update_traces(textposition="outside")
-    fig.update_layout(height=450, xaxis_tickformat=".0%")
-    return _style(fig)
-
-
-def build_paths_table(target_role):
-    """Top 5 career paths to reach a target role, returned as HTML table."""
-    paths = paths_to_role.get(target_role, [])
-    if not paths:
-        return "<p style='color:#cdd6f4;'>No career path data for this role.</p>"
+    return _figure(_industry_payload(source_industry))
 
-    # Sort by frequency descending, take top 5
-    sorted_paths = sorted(paths, key=lambda p: p["frequency"], reverse=True)[:5]
 
-    rows = ""
-    for i, entry in enumerate(sorted_paths, 1):
-        path_str = " &rarr; ".join(entry["path"])
-        freq = entry["frequency"]
-        rows += f"<tr><td style='padding:8px;color:#cdd6f4;'>{i}</td>"
-        rows += f"<td style='padding:8px;color:#cdd6f4;'>{path_str}</td>"
-        rows += f"<td style='padding:8px;color:#cdd6f4;text-align:right;'>{freq:,}</td></tr>"
-
-    html = f"""
+_PATHS_TABLE = """
     <table style="width:100%;border-collapse:collapse;background:#1e1e2e;">
       <thead>
         <tr style="border-bottom:2px solid #45475a;">
@@ -216,9 +291,47 @@ def build_paths_table(target_role):
       <tbody>{rows}</tbody>
     </table>
     """
-    return html
+
+_PATH_ROW = (
+    "<tr><td style='padding:8px;color:#cdd6f4;'>{i}</td>"
+    "<td style='padding:8px;color:#cdd6f4;'>{path}</td>"
+    "<td style='padding:8px;color:#cdd6f4;text-align:right;'>{freq:,}</td></tr>"
+)
+
+
+@lru_cache(maxsize=512)
+def build_paths_table(target_role):
+    """Top 5 career paths to reach a target role, returned as HTML table."""
+    sorted_paths = TOP5_PATHS.get(target_role)
+    if not sorted_paths:
+        return "<p style='color:#cdd6f4;'>No career path data for this role.</p>"
+
+    rows = "".join(
+        _PATH_ROW.format(i=i, path=" &rarr; ".join(entry["path"]), freq=entry["frequency"])
+        for i, entry in enumerate(sorted_paths, 1)
+    )
+
+    return _PATHS_TABLE.format(rows=rows)
+
+
+def _warm_caches():
+    """Fill the memoized builders up front so a click only ever wraps a ready figure dict.
+
+    Covers every role, industry and target-role option the dropdowns offer, but only the
+    first 50 majors; later majors and typed values fill the cache on demand.
+    """
+    for role in top_roles:
+        _role_transition_payload(role)
+    for major in top_majors[:50]:
+        _major_payload(major)
+    for industry in top_industries:
+        _industry_payload(industry)
+    for target in top_target_roles:
+        build_paths_table(target)
 
 
+_warm_caches()
+
 # ---------------------------------------------------------------------------
 # Gradio UI
 # ---------------------------------------------------------------------------
@@ -256,17 +369,17 @@ with gr.Blocks(title="SkillShock Dashboard") as demo:
                 )
             gr.Markdown("### Data Dimensions")
             with gr.Row():
-                gr.Textbox(label="Unique Roles (transitions)", value=f"{len(role_trans):,}", interactive=False)
-                gr.Textbox(label="Unique Majors", value=f"{len(major_first):,}", interactive=False)
-                gr.Textbox(label="Industries", value=f"{len(industry_trans):,}", interactive=False)
+                gr.Textbox(label="Unique Roles (transitions)", value=f"{dimension_counts['roles']:,}", interactive=False)
+                gr.Textbox(label="Unique Majors", value=f"{dimension_counts['majors']:,}", interactive=False)
+                gr.Textbox(label="Industries", value=f"{dimension_counts['industries']:,}", interactive=False)
                 gr.Textbox(label="Level Transitions", value=str(len(promo)), interactive=False)
-                gr.Textbox(label="Target Roles (paths)", value=f"{len(paths_to_role):,}", interactive=False)
+                gr.Textbox(label="Target Roles (paths)", value=f"{dimension_counts['target_roles']:,}", interactive=False)
 
         # ---- Tab 2: Promotion Velocity ----
         with gr.Tab("Promotion Velocity"):
             gr.Markdown("## Promotion Velocity by Level Transition")
             gr.Markdown("Median months between career level transitions. Red bars indicate low-confidence estimates.")
-            promo_plot = gr.Plot(value=build_promo_chart())
+            promo_plot = gr.Plot()
 
         # ---- Tab 3: Role Transitions ----
         with gr.Tab("Role Transitions"):
@@ -282,14 +395,19 @@ with gr.Blocks(title="SkillShock Dashboard") as demo:
                 value=top_roles[0],
                 label="Source Role",
             )
-            role_plot = gr.Plot(value=build_role_transition_chart(top_roles[0]))
+            role_plot = gr.Plot()
 
             def update_role_dropdown(query):
-                choices = _choices_prefix_first(top_roles, query)
+                choices = _choices_prefix_first(_top_roles_lc, query)
                 first = choices[0] if choices else None
                 return gr.update(choices=choices, value=first)
 
-            role_search.change(fn=update_role_dropdown, inputs=role_search, outputs=role_dd)
+            role_search.change(
+                fn=update_role_dropdown,
+                inputs=role_search,
+                outputs=role_dd,
+                show_progress="hidden",
+            )
             role_dd.change(fn=build_role_transition_chart, inputs=role_dd, outputs=role_plot)
 
         # ---- Tab 4: Major -> First Role ----
@@ -307,14 +425,19 @@ with gr.Blocks(title="SkillShock Dashboard") as demo:
                 label="Major / Field of Study",
                 allow_custom_value=True,
             )
-            major_plot = gr.Plot(value=build_major_chart(top_majors[0]))
+            major_plot = gr.Plot()
 
             def update_major_dropdown(query):
                 choices = _major_choices_for_search(query)
                 first = choices[0] if choices else None
                 return gr.update(choices=choices, value=first)
 
-            major_search.change(fn=update_major_dropdown, inputs=major_search, outputs=major_dd)
+            major_search.change(
+                fn=update_major_dropdown,
+                inputs=major_search,
+                outputs=major_dd,
+                show_progress="hidden",
+            )
             major_dd.change(fn=build_major_chart, inputs=major_dd, outputs=major_plot)
 
         # ---- Tab 5: Industry Transitions ----
@@ -331,14 +454,19 @@ with gr.Blocks(title="SkillShock Dashboard") as demo:
                 value=top_industries[0],
                 label="Source Industry",
             )
-            ind_plot = gr.Plot(value=build_industry_chart(top_industries[0]))
+            ind_plot = gr.Plot()
 
             def update_ind_dropdown(query):
-                choices = _choices_prefix_first(top_industries, query)
+                choices = _choices_prefix_first(_top_industries_lc, query)
                 first = choices[0] if choices else None
                 return gr.update(choices=choices, value=first)
 
-            ind_search.change(fn=update_ind_dropdown, inputs=ind_search, outputs=ind_dd)
+            ind_search.change(
+                fn=update_ind_dropdown,
+                inputs=ind_search,
+                outputs=ind_dd,
+                show_progress="hidden",
+            )
             ind_dd.change(fn=build_industry_chart, inputs=ind_dd, outputs=ind_plot)
 
         # ---- Tab 6: Career Paths ----
@@ -355,16 +483,36 @@ with gr.Blocks(title="SkillShock Dashboard") as demo:
                 value=top_target_roles[0],
                 label="Target Role",
             )
-            path_html = gr.HTML(value=build_paths_table(top_target_roles[0]))
+            path_html = gr.HTML()
 
             def update_path_dropdown(query):
-                choices = _choices_prefix_first(top_target_roles, query)
+                choices = _choices_prefix_first(_top_target_roles_lc, query)
                 first = choices[0] if choices else None
                 return gr.update(choices=choices, value=first)
 
-            path_search.change(fn=update_path_dropdown, inputs=path_search, outputs=path_dd)
+            path_search.change(
+                fn=update_path_dropdown,
+                inputs=path_search,
+                outputs=path_dd,
+                show_progress="hidden",
+            )
             path_dd.change(fn=build_paths_table, inputs=path_dd, outputs=path_html)
 
+    # Default views are rendered when a page loads, not while the Blocks are built,
+    # so startup never serializes figures before the server is listening.
+    demo.load(
+        fn=lambda: (
+            build_promo_chart(),
+            build_role_transition_chart(top_roles[0]),
+            build_major_chart(top_majors[0]),
+            build_industry_chart(top_industries[0]),
+            build_paths_table(top_target_roles[0]),
+        ),
+        inputs=None,
+        outputs=[promo_plot, role_plot, major_plot, ind_plot, path_html],
+    )
+
 
 if __name__ == "__main__":
-    demo.launch(theme=gr.themes.Soft())
+    # Every handler is a cached lookup, so several can run at once without contention
+    demo.queue(default_concurrency_limit=4, max_size=32).launch(theme=gr.themes.Soft())
@@ -5,22 +5,35 @@ import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
 
-def build_payload(metrics: dict, db_path: str, data_files: list[str]) -> dict:
+
+_COUNTS_SQL = "SELECT (SELECT COUNT(*) FROM persons), (SELECT COUNT(*) FROM jobs)"
+
+
+def build_payload(metrics: dict, db_path: str, data_files: list[str], conn: sqlite3.Connection | None = None) -> dict:
     """Build the full output payload with metadata and all 5 metric keys.
 
     Args:
         metrics: dict returned by analytics.compute_all()
         db_path: path to the SQLite database
         data_files: list of source data file paths
+        conn: optional open connection to db_path to reuse instead of opening a new one
 
     Returns:
         dict ready for JSON serialization
     """
-    conn = sqlite3.connect(db_path)
-    total_persons = conn.execute("SELECT COUNT(*) FROM persons").fetchone()[0]
-    total_jobs = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
-    conn.close()
+    if conn is not None:
+        total_persons, total_jobs = conn.execute(_COUNTS_SQL).fetchone()
+    else:
+        conn = sqlite3.connect(db_path)
+        try:
+            total_persons, total_jobs = conn.execute(_COUNTS_SQL).fetchone()
+        finally:
+            conn.close()
 
     metadata = {
         "generated_at": datetime.now(timezone.utc).isoformat(),
@@ -34,16 +47,24 @@ def build_payload(metrics: dict, db_path: str, data_files: list[str]) -> dict:
     return payload
 
 
+def _dumps(payload: dict) -> bytes:
+    """Serialize payload to indented UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        return orjson.dumps(payload, default=str, option=options)
+    return json.dumps(payload, indent=2, default=str).encode("utf-8")
+
+
 def save(payload: dict, output_path: str) -> None:
     """Write payload dict to a JSON file."""
     out = Path(output_path)
     out.parent.mkdir(parents=True, exist_ok=True)
-    out.write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
+    out.write_bytes(_dumps(payload))
 
 
-def run(metrics: dict, db_path: str, data_files: list[str], output_path: str) -> dict:
+def run(metrics: dict, db_path: str, data_files: list[str], output_path: str, conn: sqlite3.Connection | None = None) -> dict:
     """Build payload and save to file. Returns the payload."""
-    payload = build_payload(metrics, db_path, data_files)
+    payload = build_payload(metrics, db_path, data_files, conn=conn)
     save(payload, output_path)
     return payload
 
@@ -67,5 +88,5 @@ if __name__ == "__main__":
     data_files = sorted(glob(str(Path(data_dir) / "*.jsonl.gz")))
 
     metrics = analytics.compute_all(db_path)
-    payload = run(metrics, db_path, data_files, output_path)
-    print(f"Wrote {output_path} ({len(json.dumps(payload))} bytes)")
+    run(metrics, db_path, data_files, output_path)
+    print(f"Wrote {output_path} ({Path(output_path).stat().st_size} bytes)")
@@ -1,36 +1,72 @@
 """Parse JSONL.GZ files into SQLite persons, jobs, education, changes tables."""
 
 import gzip
+import io
 import json
 import logging
+import os
 import re
 import sqlite3
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from functools import lru_cache
 from glob import glob
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib parser
+    orjson = None
+
+try:
+    import rapidgzip
+except ImportError:  # optional: falls back to single-threaded gzip
+    rapidgzip = None
+
+if orjson is not None:
+    def _json_loads(line: bytes):
+        """Parse with orjson, retrying with the stdlib parser on lines orjson is stricter about.
+
+        json.loads also accepts NaN/Infinity and lone surrogate escapes, so those records
+        load exactly as they did before orjson; only lines neither parser accepts raise
+        (orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch one type).
+        """
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            return json.loads(line)
+else:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
 # Level normalization
 # ---------------------------------------------------------------------------
 
-_LEVEL_RULES: list[tuple[re.Pattern, str]] = [
-    (re.compile(r"\b(c-suite|chief|ceo|cto|cfo|coo)\b", re.I), "C-Suite"),
-    (re.compile(r"\b(evp|svp|vice\s*president|vp)\b", re.I), "VP"),
-    (re.compile(r"\b(senior\s+director|director)\b", re.I), "Director"),
-    (re.compile(r"\b(senior\s+manager|manager)\b", re.I), "Manager"),
-    (re.compile(r"\b(principal|staff|lead)\b", re.I), "Staff"),
-    (re.compile(r"\b(senior|sr)\b", re.I), "Senior"),
-    (re.compile(r"\b(junior|associate|entry|ic)\b", re.I), "IC"),
+# Rules are tried in order (first hit wins); each entry holds the compiled pattern's bound
+# .search so the per-job loop skips the attribute lookup.
+_LEVEL_RULES: list[tuple[Callable[[str], re.Match | None], str]] = [
+    (re.compile(r"\b(c-suite|chief|ceo|cto|cfo|coo)\b", re.I).search, "C-Suite"),
+    (re.compile(r"\b(evp|svp|vice\s*president|vp)\b", re.I).search, "VP"),
+    (re.compile(r"\b(senior\s+director|director)\b", re.I).search, "Director"),
+    (re.compile(r"\b(senior\s+manager|manager)\b", re.I).search, "Manager"),
+    (re.compile(r"\b(principal|staff|lead)\b", re.I).search, "Staff"),
+    (re.compile(r"\b(senior|sr)\b", re.I).search, "Senior"),
+    (re.compile(r"\b(junior|associate|entry|ic)\b", re.I).search, "IC"),
 ]
 
 
+# Raw level strings repeat across millions of jobs, so each distinct value is classified once
+@lru_cache(maxsize=4096)
 def normalize_level(raw: str | None) -> str:
     """Map a raw level/title string to a canonical level."""
     if not raw:
         return "Unknown"
-    for pattern, level in _LEVEL_RULES:
-        if pattern.search(raw):
+    for search, level in _LEVEL_RULES:
+        if search(raw):
             return level
     return "Unknown"
 
@@ -39,16 +75,25 @@ def normalize_level(raw: str | None) -> str:
 # Date helpers
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=8192)
+def _month_index(year_month: str) -> int | None:
+    """Absolute month number (year * 12 + month) for a "YYYY-MM" prefix, or None if unparseable."""
+    try:
+        return int(year_month[:4]) * 12 + int(year_month[5:7])
+    except ValueError:
+        return None
+
+
 def months_between(start_str: str | None, end_str: str | None) -> int | None:
     """Return the number of months between two ISO date strings, or None."""
     if not start_str or not end_str:
         return None
-    try:
-        sy, sm = int(start_str[:4]), int(start_str[5:7])
-        ey, em = int(end_str[:4]), int(end_str[5:7])
-        return max(0, (ey - sy) * 12 + (em - sm))
-    except (ValueError, IndexError):
+    # Only the YYYY-MM prefix matters, and those repeat heavily across jobs
+    start = _month_index(start_str[:7])
+    end = _month_index(end_str[:7])
+    if start is None or end is None:
         return None
+    return max(0, end - start)
 
 
 # ---------------------------------------------------------------------------
@@ -99,6 +144,16 @@ CREATE TABLE IF NOT EXISTS changes (
 """
 
 
+# Bulk-load settings: WAL plus synchronous=NORMAL drops the per-commit fsync of the
+# rollback journal, and the larger page cache keeps the growing tables' B-trees in memory.
+_BULK_LOAD_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-200000;
+"""
+
+
 def create_tables(conn: sqlite3.Connection) -> None:
     """Create all four tables if they don't exist."""
     conn.executescript(_CREATE_TABLES_SQL)
@@ -108,31 +163,39 @@ def create_tables(conn: sqlite3.Connection) -> None:
 # Record loading
 # ---------------------------------------------------------------------------
 
-def load_record(record: dict, conn: sqlite3.Connection) -> None:
-    """Insert one person record (with jobs, education, changes) into the DB."""
+_INSERT_PERSON_SQL = "INSERT OR IGNORE INTO persons (id, created_at, employment_status, connections, location_country, location_city) VALUES (?,?,?,?,?,?)"
+_INSERT_JOB_SQL = "INSERT INTO jobs (person_id, title, function, level, company_name, company_industry, started_at, ended_at, duration_months, company_tenure_months) VALUES (?,?,?,?,?,?,?,?,?,?)"
+_INSERT_EDUCATION_SQL = "INSERT INTO education (person_id, school, degree, field, started_at, ended_at) VALUES (?,?,?,?,?,?)"
+_INSERT_CHANGE_SQL = "INSERT INTO changes (person_id, title_change_detected_at, company_change_detected_at, info_change_detected_at) VALUES (?,?,?,?)"
+
+# Records parsed per executemany flush in ingest_file
+_BATCH_SIZE = 500
+
+# Shared read-only stand-in for missing or non-dict nested objects; never mutated
+_EMPTY: dict = {}
+
+
+def _record_rows(record: dict) -> tuple[tuple, list[tuple], list[tuple], tuple]:
+    """Parse one person record into (person, jobs, education, change) row tuples without touching the DB."""
     pid = record["id"]
 
     # Location: support both nested location_details dict and flat location dict
-    loc = record.get("location_details") or record.get("location") or {}
-    if isinstance(loc, dict):
-        country = loc.get("country") or record.get("country")
-        city = loc.get("locality") or loc.get("city")
-    else:
-        country = record.get("country")
-        city = None
-
-    conn.execute(
-        "INSERT OR IGNORE INTO persons (id, created_at, employment_status, connections, location_country, location_city) VALUES (?,?,?,?,?,?)",
-        (
-            pid,
-            record.get("created_at"),
-            record.get("employment_status"),
-            record.get("connections"),
-            country,
-            city,
-        ),
+    loc = record.get("location_details") or record.get("location")
+    if not isinstance(loc, dict):
+        loc = _EMPTY
+    country = loc.get("country") or record.get("country")
+    city = loc.get("locality") or loc.get("city")
+
+    person = (
+        pid,
+        record.get("created_at"),
+        record.get("employment_status"),
+        record.get("connections"),
+        country,
+        city,
     )
 
+    jobs = []
     for job in record.get("jobs", []):
         started = job.get("started_at")
         ended = job.get("ended_at")
@@ -150,108 +213,204 @@ def load_record(record: dict, conn: sqlite3.Connection) -> None:
         duration = job.get("duration") or months_between(started, ended)
         tenure = job.get("company_tenure") or months_between(started, ended)
 
-        conn.execute(
-            "INSERT INTO jobs (person_id, title, function, level, company_name, company_industry, started_at, ended_at, duration_months, company_tenure_months) VALUES (?,?,?,?,?,?,?,?,?,?)",
-            (
-                pid,
-                job.get("title"),
-                job.get("function"),
-                normalize_level(job.get("level") or job.get("seniority") or ""),
-                company_name,
-                company_industry,
-                started,
-                ended,
-                duration,
-                tenure,
-            ),
-        )
-
-    for edu in record.get("education", []):
-        conn.execute(
-            "INSERT INTO education (person_id, school, degree, field, started_at, ended_at) VALUES (?,?,?,?,?,?)",
-            (
-                pid,
-                edu.get("school"),
-                edu.get("degree"),
-                edu.get("field") or edu.get("major"),
-                edu.get("started_at"),
-                edu.get("ended_at"),
-            ),
+        jobs.append((
+            pid,
+            job.get("title"),
+            job.get("function"),
+            normalize_level(job.get("level") or job.get("seniority") or ""),
+            company_name,
+            company_industry,
+            started,
+            ended,
+            duration,
+            tenure,
+        ))
+
+    education = [
+        (
+            pid,
+            edu.get("school"),
+            edu.get("degree"),
+            edu.get("field") or edu.get("major"),
+            edu.get("started_at"),
+            edu.get("ended_at"),
         )
+        for edu in record.get("education", [])
+    ]
 
     # Changes: support both top-level fields and nested "changes" dict
-    chg = record.get("changes") or {}
-    title_change = chg.get("title_change_detected_at") if isinstance(chg, dict) else None
-    title_change = title_change or record.get("title_change_detected_at")
-    company_change = chg.get("company_change_detected_at") if isinstance(chg, dict) else None
-    company_change = company_change or record.get("company_change_detected_at")
-    info_change = chg.get("info_change_detected_at") if isinstance(chg, dict) else None
-    info_change = info_change or record.get("info_change_detected_at")
-
-    conn.execute(
-        "INSERT INTO changes (person_id, title_change_detected_at, company_change_detected_at, info_change_detected_at) VALUES (?,?,?,?)",
-        (
-            pid,
-            title_change,
-            company_change,
-            info_change,
-        ),
+    chg = record.get("changes")
+    if not isinstance(chg, dict):
+        chg = _EMPTY
+    change = (
+        pid,
+        chg.get("title_change_detected_at") or record.get("title_change_detected_at"),
+        chg.get("company_change_detected_at") or record.get("company_change_detected_at"),
+        chg.get("info_change_detected_at") or record.get("info_change_detected_at"),
     )
 
+    return person, jobs, education, change
+
+
+def _insert_rows(conn: sqlite3.Connection, persons, jobs, education, changes) -> None:
+    """Insert batches of row tuples, one prepared statement per table."""
+    conn.executemany(_INSERT_PERSON_SQL, persons)
+    conn.executemany(_INSERT_JOB_SQL, jobs)
+    conn.executemany(_INSERT_EDUCATION_SQL, education)
+    conn.executemany(_INSERT_CHANGE_SQL, changes)
+
+
+def load_record(record: dict, conn: sqlite3.Connection) -> None:
+    """Insert one person record (with jobs, education, changes) into the DB."""
+    person, jobs, education, change = _record_rows(record)
+    _insert_rows(conn, [person], jobs, education, [change])
+
 
 # ---------------------------------------------------------------------------
 # File / directory ingestion
 # ---------------------------------------------------------------------------
 
-def _open_jsonl(filepath: Path):
-    """Open a .jsonl or .jsonl.gz file for reading text."""
+def _open_jsonl(filepath: Path, threads: int | None = None):
+    """Open a .jsonl or .jsonl.gz file for reading raw UTF-8 lines (bytes; the JSON parser decodes).
+
+    threads caps rapidgzip's inflate threads (default: CPU count).
+    """
     if str(filepath).endswith(".gz"):
-        return gzip.open(filepath, "rt", encoding="utf-8")
-    return open(filepath, "r", encoding="utf-8")
+        if rapidgzip is not None:
+            # Inflates deflate blocks on a thread pool instead of zlib's single stream. Its reader
+            # is unbuffered, so line iteration needs the BufferedReader on top.
+            parallelization = threads or os.cpu_count() or 1
+            return io.BufferedReader(rapidgzip.open(str(filepath), parallelization=parallelization))
+        return gzip.open(filepath, "rb")
+    return open(filepath, "rb")
+
 
+def ingest_file(filepath, conn: sqlite3.Connection, threads: int | None = None) -> tuple[int, int]:
+    """Ingest a single JSONL or JSONL.GZ file. Returns (loaded, skipped).
 
-def ingest_file(filepath, conn: sqlite3.Connection) -> tuple[int, int]:
-    """Ingest a single JSONL or JSONL.GZ file. Returns (loaded, skipped)."""
+    threads caps the decompression threads used for .gz input (default: CPU count).
+    """
     filepath = Path(filepath)
     loaded = 0
     skipped = 0
 
-    with _open_jsonl(filepath) as fh:
+    # One explicit transaction per file, whatever the connection's isolation_level
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    persons, jobs, education, changes = [], [], [], []
+    with _open_jsonl(filepath, threads) as fh:
         for line in fh:
             line = line.strip()
             if not line:
                 continue
             try:
-                record = json.loads(line)
-                load_record(record, conn)
-                loaded += 1
+                record = _json_loads(line)
+                person, person_jobs, person_edu, change = _record_rows(record)
             except (json.JSONDecodeError, KeyError) as exc:
                 logger.warning("Skipping malformed line in %s: %s", filepath, exc)
                 skipped += 1
                 continue
 
+            persons.append(person)
+            jobs.extend(person_jobs)
+            education.extend(person_edu)
+            changes.append(change)
+            loaded += 1
+            if len(persons) >= _BATCH_SIZE:
+                _insert_rows(conn, persons, jobs, education, changes)
+                persons, jobs, education, changes = [], [], [], []
+
+    _insert_rows(conn, persons, jobs, education, changes)
     conn.commit()
     logger.info(f"{Path(filepath).name}: loaded={loaded} skipped={skipped}")
     return loaded, skipped
 
 
-def run(data_dir: str, db_path: str) -> int:
-    """Ingest all matching JSONL / JSONL.GZ files from data_dir into db_path. Returns total loaded."""
-    conn = sqlite3.connect(db_path)
-    create_tables(conn)
+# Scratch DBs are only read back once by _merge_file_db, so durability is irrelevant there
+_SCRATCH_PRAGMAS = """
+PRAGMA journal_mode=OFF;
+PRAGMA synchronous=OFF;
+PRAGMA temp_store=MEMORY;
+"""
+
+# Ids are left out so merged rows are renumbered in file order, exactly as a serial load would
+_MERGE_SQL = """
+INSERT OR IGNORE INTO persons SELECT * FROM src.persons ORDER BY rowid;
+INSERT INTO jobs (person_id, title, function, level, company_name, company_industry, started_at, ended_at, duration_months, company_tenure_months)
+    SELECT person_id, title, function, level, company_name, company_industry, started_at, ended_at, duration_months, company_tenure_months
+    FROM src.jobs ORDER BY id;
+INSERT INTO education (person_id, school, degree, field, started_at, ended_at)
+    SELECT person_id, school, degree, field, started_at, ended_at FROM src.education ORDER BY id;
+INSERT INTO changes (person_id, title_change_detected_at, company_change_detected_at, info_change_detected_at)
+    SELECT person_id, title_change_detected_at, company_change_detected_at, info_change_detected_at FROM src.changes ORDER BY id;
+"""
+
+
+def _ingest_to_scratch(filepath: str, scratch_path: str, threads: int) -> int:
+    """Worker: ingest one file into its own scratch DB with a `threads` decompression budget. Returns records loaded."""
+    conn = sqlite3.connect(scratch_path)
+    try:
+        conn.executescript(_SCRATCH_PRAGMAS)
+        create_tables(conn)
+        loaded, _ = ingest_file(filepath, conn, threads=threads)
+    finally:
+        conn.close()
+    return loaded
+
 
+def _merge_file_db(conn: sqlite3.Connection, scratch_path: str) -> None:
+    """Append one scratch DB's rows to conn in a single transaction, entirely inside SQLite."""
+    conn.execute("ATTACH DATABASE ? AS src", (scratch_path,))
+    try:
+        conn.executescript("BEGIN;" + _MERGE_SQL + "COMMIT;")
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.execute("DETACH DATABASE src")
+
+
+def run(data_dir: str, db_path: str, workers: int | None = None) -> int:
+    """Ingest all matching JSONL / JSONL.GZ files from data_dir into db_path. Returns total loaded.
+
+    With more than one file and more than one worker (default: CPU count), files are parsed in
+    parallel processes into scratch DBs which are merged in file order, so the result is identical
+    to a serial load.
+    """
     base = Path(data_dir)
     files = sorted(glob(str(base / "live_data_persons_history_*.jsonl.gz"))) + sorted(glob(str(base / "live_data_persons_history_*.jsonl")))
     files = sorted(set(files))  # dedupe and sort
     if not files:
         raise FileNotFoundError(f"No JSONL or JSONL.GZ files in {data_dir}")
 
+    workers = min(workers or os.cpu_count() or 1, len(files))
     total = 0
-    for fp in files:
-        loaded, _ = ingest_file(fp, conn)
-        total += loaded
-
-    conn.close()
+    with closing(sqlite3.connect(db_path)) as conn:
+        create_tables(conn)
+        conn.executescript(_BULK_LOAD_PRAGMAS)
+        try:
+            if workers <= 1:
+                for fp in files:
+                    loaded, _ = ingest_file(fp, conn)
+                    total += loaded
+            else:
+                # Scratch DBs sit next to the target so the merge never crosses filesystems
+                with tempfile.TemporaryDirectory(dir=Path(db_path).resolve().parent) as scratch_dir:
+                    scratch_paths = [str(Path(scratch_dir) / f"part_{i}.db") for i in range(len(files))]
+                    # Split the cores between the worker processes so each one's inflate threads stay within its share
+                    threads = [max(1, (os.cpu_count() or 1) // workers)] * len(files)
+                    with ProcessPoolExecutor(max_workers=workers) as pool:
+                        # map yields in submission order, so each file merges as soon as it and its predecessors are done
+                        for loaded, scratch_path in zip(pool.map(_ingest_to_scratch, files, scratch_paths, threads), scratch_paths):
+                            _merge_file_db(conn, scratch_path)
+                            total += loaded
+        finally:
+            # WAL is only for the load; readers open the DB read-only and could not clean up -wal/-shm.
+            # The mode cannot change inside a transaction, so a file that failed mid-load is rolled back first.
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute("PRAGMA journal_mode=DELETE")
     return total
 
 
@@ -260,7 +419,6 @@ def run(data_dir: str, db_path: str) -> int:
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
-    import os
     try:
         from dotenv import load_dotenv
         load_dotenv()
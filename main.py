@@ -2,6 +2,7 @@
 import logging
 import os
 import sys
+from contextlib import closing
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -38,22 +39,32 @@ def main():
         logger.error(f"Ingest failed: {e}")
         sys.exit(1)
 
-    # Step 2: Analytics
-    logger.info("=== Step 2/4: Analytics ===")
+    # Steps 2 and 3 share one read-only connection for the jobs frame and the export counts. In
+    # step 2 only major_to_first_role and paths_to_role use it; the three transition metrics run
+    # on compute_all's worker threads over their own connections.
     try:
-        metrics = analytics.compute_all(db_path)
+        conn = analytics.open_db(db_path)
     except Exception as e:
         logger.error(f"Analytics failed: {e}")
         sys.exit(1)
 
-    # Step 3: Export
-    logger.info("=== Step 3/4: Export ===")
-    try:
-        export.run(metrics, db_path, data_files=[str(f) for f in data_files], output_path=output_path)
-        logger.info(f"Output written to {output_path}")
-    except Exception as e:
-        logger.error(f"Export failed: {e}")
-        sys.exit(1)
+    with closing(conn):
+        # Step 2: Analytics
+        logger.info("=== Step 2/4: Analytics ===")
+        try:
+            metrics = analytics.compute_all(db_path, conn=conn)
+        except Exception as e:
+            logger.error(f"Analytics failed: {e}")
+            sys.exit(1)
+
+        # Step 3: Export
+        logger.info("=== Step 3/4: Export ===")
+        try:
+            export.run(metrics, db_path, data_files=[str(f) for f in data_files], output_path=output_path, conn=conn)
+            logger.info(f"Output written to {output_path}")
+        except Exception as e:
+            logger.error(f"Export failed: {e}")
+            sys.exit(1)
 
     # Step 4: Push
     logger.info("=== Step 4/4: Push ===")
@@ -1,14 +1,41 @@
 """push.py — Upload output.json to RapidFire AI."""
-import json
 import logging
 import os
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
 
+def _make_session() -> requests.Session:
+    """Keep-alive session that retries the upload only when the server cannot have processed it.
+
+    Connection failures and 503 are retried with backoff; read timeouts and other statuses are
+    not, since the POST may already have been applied. raise_on_status=False hands the final
+    response back so raise_for_status() reports the real HTTP error rather than a RetryError.
+    """
+    retry = Retry(
+        connect=3,
+        read=0,
+        status=3,
+        backoff_factor=0.5,
+        status_forcelist=(503,),
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False,
+    )
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry))
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry))
+    return session
+
+
+# Shared so repeated pushes from one process reuse the TCP/TLS connection
+_session = _make_session()
+
+
 def run(output_path, api_key, upload_url):
     if not api_key:
         logger.warning("RAPIDFIRE_API_KEY not set — skipping push. Output saved locally.")
@@ -18,12 +45,13 @@ def run(output_path, api_key, upload_url):
         logger.warning("RAPIDFIRE_UPLOAD_URL not set — skipping push.")
         return False
 
-    payload = json.loads(Path(output_path).read_text(encoding="utf-8"))
+    # output.json is already the JSON body; send its bytes as-is instead of parsing and re-encoding
+    body = Path(output_path).read_bytes()
 
     logger.info(f"Pushing to RapidFire AI: {upload_url}")
-    response = requests.post(
+    response = _session.post(
         upload_url,
-        json=payload,
+        data=body,
         headers={
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
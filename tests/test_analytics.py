@@ -72,3 +72,53 @@ def test_compute_all_returns_all_five_keys(populated_db):
         "industry_transitions",
         "paths_to_role",
     }
+
+def test_compute_all_matches_individual_metrics(populated_db):
+    result = analytics.compute_all(populated_db)
+    assert result["promotion_velocity"] == analytics.promotion_velocity(populated_db)
+    assert result["role_transitions"] == analytics.role_transitions(populated_db)
+    assert result["paths_to_role"] == analytics.paths_to_role(populated_db)
+
+def test_missing_db_is_not_created(tmp_path):
+    db_path = tmp_path / "missing.db"
+    with pytest.raises(sqlite3.OperationalError):
+        analytics.compute_all(str(db_path))
+    assert not db_path.exists()
+
+def test_promotion_velocity_accepts_month_only_dates(tmp_path):
+    db_path = str(tmp_path / "months.db")
+    conn = sqlite3.connect(db_path)
+    ingest.create_tables(conn)
+    for i in range(3):
+        ingest.load_record({
+            "id": f"p{i}",
+            "jobs": [
+                {"title": "Engineer", "level": "IC", "started_at": "2018-01"},
+                {"title": "Senior Engineer", "level": "Senior", "started_at": "2020-01"},
+            ],
+        }, conn)
+    conn.commit()
+    conn.close()
+
+    result = analytics.promotion_velocity(db_path)
+    assert result == {"IC -> Senior": {"median_months": 24.0, "sample_size": 3, "low_confidence": True}}
+
+def test_compute_all_accepts_out_of_range_dates(tmp_path):
+    db_path = str(tmp_path / "sentinel.db")
+    conn = sqlite3.connect(db_path)
+    ingest.create_tables(conn)
+    ingest.load_record({
+        "id": "p0",
+        "jobs": [
+            {"title": "Engineer", "level": "IC", "started_at": "0001-01-01"},
+            {"title": "Senior Engineer", "level": "Senior", "started_at": "2020-01-01"},
+            {"title": "Manager", "level": "Manager", "started_at": "9999-12-31"},
+        ],
+        "education": [{"field": "CS"}],
+    }, conn)
+    conn.commit()
+    conn.close()
+
+    result = analytics.compute_all(db_path)
+    assert result["major_to_first_role"] == {"CS": {"Engineer": 1.0}}
+    assert result["paths_to_role"] == {"Manager": [{"path": ["Engineer", "Senior Engineer", "Manager"], "frequency": 1}]}
@@ -41,6 +41,15 @@ def test_metadata_counts_match_db(metrics_and_db):
     payload = export.build_payload(metrics, db_path, data_files=[])
     assert payload["metadata"]["total_persons"] == 20
 
+def test_build_payload_reuses_open_connection(metrics_and_db):
+    metrics, db_path = metrics_and_db
+    conn = sqlite3.connect(db_path)
+    payload = export.build_payload(metrics, db_path, data_files=[], conn=conn)
+    assert conn.execute("SELECT 1").fetchone() == (1,)  # still open
+    conn.close()
+    assert payload["metadata"]["total_persons"] == 20
+    assert payload["metadata"]["total_jobs"] == export.build_payload(metrics, db_path, data_files=[])["metadata"]["total_jobs"]
+
 def test_payload_is_json_serializable(metrics_and_db):
     metrics, db_path = metrics_and_db
     payload = export.build_payload(metrics, db_path, data_files=[])
@@ -55,3 +64,10 @@ def test_save_writes_file(metrics_and_db, tmp_path):
     assert out.exists()
     loaded = json.loads(out.read_text())
     assert "metadata" in loaded
+
+def test_save_round_trips_payload(metrics_and_db, tmp_path):
+    metrics, db_path = metrics_and_db
+    out = tmp_path / "output.json"
+    payload = export.build_payload(metrics, db_path, data_files=[])
+    export.save(payload, str(out))
+    assert json.loads(out.read_text()) == json.loads(json.dumps(payload, default=str))
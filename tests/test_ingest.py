@@ -1,3 +1,6 @@
+import gzip
+import json
+import shutil
 import sqlite3
 from pathlib import Path
 import pytest
@@ -49,14 +52,12 @@ def test_level_normalized(db):
     assert levels.issubset(valid_levels)
 
 def test_run_accepts_data_dir(tmp_path):
-    import shutil
     shutil.copy(FIXTURE, tmp_path / "live_data_persons_history_2026-02-19_00.jsonl.gz")
     db_path = str(tmp_path / "test.db")
     total = ingest.run(str(tmp_path), db_path)
     assert total == 20
 
 def test_malformed_lines_skipped(db, tmp_path):
-    import gzip
     bad_file = tmp_path / "live_data_persons_history_bad.jsonl.gz"
     with gzip.open(bad_file, "wt") as f:
         f.write('{"id": "ok", "jobs": [], "education": [], "changes": {}}\n')
@@ -65,3 +66,99 @@ def test_malformed_lines_skipped(db, tmp_path):
     loaded, skipped = ingest.ingest_file(bad_file, db)
     assert loaded == 2
     assert skipped == 1
+
+def test_lines_rejected_by_orjson_still_load(db, tmp_path):
+    lenient_file = tmp_path / "live_data_persons_history_lenient.jsonl.gz"
+    with gzip.open(lenient_file, "wt") as f:
+        f.write('{"id": "nan", "connections": NaN, "jobs": [], "education": [], "changes": {}}\n')
+        f.write('{"id": "inf", "connections": Infinity, "jobs": [], "education": [], "changes": {}}\n')
+        f.write('{"id": "surrogate", "headline": "\\ud800", "jobs": [], "education": [], "changes": {}}\n')
+        f.write('NOT JSON\n')
+    loaded, skipped = ingest.ingest_file(lenient_file, db)
+    assert (loaded, skipped) == (3, 1)
+    ids = [row[0] for row in db.execute("SELECT id FROM persons ORDER BY rowid")]
+    assert ids == ["nan", "inf", "surrogate"]
+
+def test_batched_ingest_rows_span_flushes(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "_BATCH_SIZE", 2)  # 3 records: one full flush plus the remainder
+    records = [
+        {
+            "id": "p1",
+            "created_at": "2024-01-01",
+            "connections": 10,
+            "location_details": {"country": "US", "locality": "Austin"},
+            "jobs": [
+                {"title": "Engineer", "level": "Senior", "company": {"name": "Acme", "industry": "Software"},
+                 "started_at": "2019-01-01", "ended_at": "2020-07-01"},
+                {"title": "Staff Engineer", "seniority": "Staff", "company_name": "Beta",
+                 "started_at": "2020-07-01"},
+            ],
+            "education": [{"school": "MIT", "degree": "BS", "major": "CS", "started_at": "2015", "ended_at": "2019"}],
+            "changes": {"title_change_detected_at": "2024-02-01"},
+        },
+        {"id": "p2", "country": "CA", "jobs": [], "education": [], "company_change_detected_at": "2024-03-01"},
+        {
+            "id": "p3",
+            "location": {"country": "UK", "city": "London"},
+            "jobs": [{"title": "Director", "level": "Director", "duration": 12, "company_tenure": 30,
+                      "started_at": "2021-01", "ended_at": "2022-01"}],
+        },
+    ]
+    data_file = tmp_path / "live_data_persons_history_batched.jsonl.gz"
+    with gzip.open(data_file, "wt") as f:
+        f.writelines(json.dumps(r) + "\n" for r in records)
+
+    assert ingest.ingest_file(data_file, db) == (3, 0)
+    assert db.execute("SELECT * FROM persons ORDER BY rowid").fetchall() == [
+        ("p1", "2024-01-01", None, 10, "US", "Austin"),
+        ("p2", None, None, None, "CA", None),
+        ("p3", None, None, None, "UK", "London"),
+    ]
+    assert db.execute("SELECT * FROM jobs ORDER BY id").fetchall() == [
+        (1, "p1", "Engineer", None, "Senior", "Acme", "Software", "2019-01-01", "2020-07-01", 18, 18),
+        (2, "p1", "Staff Engineer", None, "Staff", "Beta", None, "2020-07-01", None, None, None),
+        (3, "p3", "Director", None, "Director", None, None, "2021-01", "2022-01", 12, 30),
+    ]
+    assert db.execute("SELECT * FROM education ORDER BY id").fetchall() == [
+        (1, "p1", "MIT", "BS", "CS", "2015", "2019"),
+    ]
+    assert db.execute("SELECT * FROM changes ORDER BY id").fetchall() == [
+        (1, "p1", "2024-02-01", None, None),
+        (2, "p2", None, "2024-03-01", None),
+        (3, "p3", None, None, None),
+    ]
+
+def test_parallel_run_matches_serial(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    shutil.copy(FIXTURE, data_dir / "live_data_persons_history_a.jsonl.gz")
+    with gzip.open(FIXTURE, "rt") as src, gzip.open(data_dir / "live_data_persons_history_b.jsonl.gz", "wt") as dst:
+        dst.writelines(reversed(src.readlines()))  # duplicate persons across files, different job order
+
+    results = {}
+    for workers in (1, 2):
+        db_path = str(tmp_path / f"w{workers}.db")
+        total = ingest.run(str(data_dir), db_path, workers=workers)
+        conn = sqlite3.connect(db_path)
+        tables = {t: conn.execute(f"SELECT * FROM {t} ORDER BY rowid").fetchall() for t in ("persons", "jobs", "education", "changes")}
+        conn.close()
+        results[workers] = (total, tables)
+    assert results[1] == results[2]
+    assert results[2][0] == 40
+    assert not list(tmp_path.glob("tmp*"))  # scratch DBs cleaned up
+
+def test_run_restores_journal_mode_after_failed_load(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    db_path = str(tmp_path / "test.db")
+    with pytest.raises(FileNotFoundError):
+        ingest.run(str(data_dir), db_path)
+    assert not Path(db_path).exists()
+
+    # A lone surrogate parses but cannot be stored, so the load fails mid-file
+    (data_dir / "live_data_persons_history_bad.jsonl").write_text('{"id": "x", "jobs": [{"title": "\\ud800"}]}\n')
+    with pytest.raises(UnicodeEncodeError):
+        ingest.run(str(data_dir), db_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    conn.close()